@@ -4,11 +4,41 @@ CML API Client
 Handles authentication and HTTP requests to the Cisco Modeling Labs API.
 """
 
-import sys
+import logging
+import ssl
+import certifi
 import httpx
+import orjson
 from typing import Optional
 
 
+logger = logging.getLogger(__name__)
+
+# Shared SSL context, built once rather than per client instance. Uses the
+# certifi bundle so trust matches httpx's default verify=True behaviour.
+_SSL_CTX = ssl.create_default_context(cafile=certifi.where())
+
+# Headers for orjson-encoded request bodies, shared across requests
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Whether urllib3's insecure request warnings have already been silenced
+_ssl_warnings_disabled = False
+
+
+def _disable_ssl_warnings() -> None:
+    """Suppress urllib3 insecure request warnings, once per process"""
+    global _ssl_warnings_disabled
+    if _ssl_warnings_disabled:
+        return
+    _ssl_warnings_disabled = True
+    
+    try:
+        import urllib3
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    except ImportError:
+        logger.warning("urllib3 not available, SSL warning suppression disabled")
+
+
 class CMLAuth:
     """Authentication and request handling for Cisco Modeling Labs"""
     
@@ -27,15 +57,18 @@ class CMLAuth:
         self.password = password
         self.token = None
         self.verify_ssl = verify_ssl
-        self.client = httpx.AsyncClient(base_url=base_url, verify=verify_ssl)
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            verify=_SSL_CTX if verify_ssl else False,
+            http2=True,
+            # A small pool favors multiplexing over a single HTTP/2 connection
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=10, keepalive_expiry=30.0),
+            timeout=httpx.Timeout(30.0, connect=10.0)
+        )
         
         # Suppress SSL warnings if verify_ssl is False
         if not verify_ssl:
-            try:
-                import urllib3
-                urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-            except ImportError:
-                print("urllib3 not available, SSL warning suppression disabled", file=sys.stderr)
+            _disable_ssl_warnings()
     
     async def authenticate(self) -> str:
         """
@@ -47,23 +80,21 @@ class CMLAuth:
         Raises:
             httpx.HTTPStatusError: If authentication fails
         """
-        print(f"Authenticating with CML at {self.base_url}", file=sys.stderr)
+        logger.info("Authenticating with CML at %s", self.base_url)
         response = await self.client.post(
             "/api/v0/authenticate",
             json={"username": self.username, "password": self.password}
         )
         response.raise_for_status()
-        self.token = response.text.strip('"')
+        
+        # The token comes back as a JSON string; slice off the quotes on the raw bytes
+        raw = response.content
+        if raw[:1] == b'"' and raw[-1:] == b'"':
+            raw = raw[1:-1]
+        self.token = raw.decode("ascii")
         self.client.headers.update({"Authorization": f"Bearer {self.token}"})
+        logger.info("Authentication successful")
         
-        # Verify the token works
-        try:
-            auth_check = await self.client.get("/api/v0/authok")
-            auth_check.raise_for_status()
-            print(f"Authentication successful, token verified", file=sys.stderr)
-        except Exception as e:
-            print(f"Warning: Token verification failed: {str(e)}", file=sys.stderr)
-            
         return self.token
     
     async def request(self, method: str, endpoint: str, **kwargs) -> httpx.Response:
@@ -84,28 +115,41 @@ class CMLAuth:
         if not self.token:
             await self.authenticate()
         
-        print(f"Making {method} request to {endpoint}", file=sys.stderr)
+        logger.debug("Making %s request to %s", method, endpoint)
         
-        if "headers" not in kwargs:
-            kwargs["headers"] = {}
-        
-        kwargs["headers"]["Authorization"] = f"Bearer {self.token}"
+        # Serialize JSON bodies with orjson rather than httpx's stdlib encoder
+        if "json" in kwargs:
+            kwargs["content"] = orjson.dumps(kwargs.pop("json"))
+            if "headers" in kwargs:
+                kwargs["headers"] = {**kwargs["headers"], **_JSON_HEADERS}
+            else:
+                kwargs["headers"] = _JSON_HEADERS
         
+        # The Authorization header is set on the client itself by authenticate()
         try:
             response = await self.client.request(method, endpoint, **kwargs)
             
             # If unauthorized, re-authenticate once
             if response.status_code == 401:
-                print(f"Got 401 response, re-authenticating...", file=sys.stderr)
+                logger.info("Got 401 response, re-authenticating...")
                 await self.authenticate()
-                kwargs["headers"]["Authorization"] = f"Bearer {self.token}"
                 response = await self.client.request(method, endpoint, **kwargs)
             
             response.raise_for_status()
             return response
         except Exception as e:
-            print(f"Request error: {str(e)}", file=sys.stderr)
+            logger.warning("Request error: %s", e)
             raise
+    
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client and its connection pool"""
+        await self.client.aclose()
+    
+    async def __aenter__(self) -> "CMLAuth":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
 
 
 # Global state for CML client
@@ -2,13 +2,16 @@
 CML Lab Builder MCP Server
 
 A lean MCP server for building and managing Cisco Modeling Labs topologies.
-Focused on the 8 core tools needed for lab creation and topology building.
+Focused on the 10 core tools needed for lab creation and topology building.
 """
 
+import logging
 import os
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastmcp import FastMCP
 
+from .client import get_client
 from .tools import (
     register_auth_tools,
     register_lab_lifecycle_tools,
@@ -19,8 +22,20 @@ from .tools import (
 # Load environment variables
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """Close the CML client's connection pool when the server shuts down"""
+    try:
+        yield
+    finally:
+        client = get_client()
+        if client is not None:
+            await client.aclose()
+
+
 # Create the FastMCP server
-mcp = FastMCP("cml-lab-builder")
+mcp = FastMCP("cml-lab-builder", lifespan=lifespan)
 
 # Register all tool groups
 register_auth_tools(mcp)
@@ -35,6 +50,16 @@ def main():
     host = os.getenv("MCP_HOST", "0.0.0.0")
     port = int(os.getenv("MCP_PORT", "8000"))
     
+    # Log to stderr so stdout stays reserved for the stdio transport
+    log_level = os.getenv("LOG_LEVEL", "INFO").upper()
+    valid_level = isinstance(logging.getLevelName(log_level), int)
+    logging.basicConfig(level=log_level if valid_level else "INFO")
+    if not valid_level:
+        logging.getLogger(__name__).warning("Unknown LOG_LEVEL %r, using INFO", log_level)
+    
+    # httpx logs every request at INFO; keep it quiet unless something goes wrong
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    
     # Run the server
     mcp.run(transport="stdio")
 
@@ -2,9 +2,14 @@
 Authentication tools for CML Lab Builder
 """
 
-import sys
+import logging
 from fastmcp import FastMCP
-from ..client import CMLAuth, set_client
+from ..client import CMLAuth, get_client, set_client
+from ..utils import check_auth
+from .topology import reset_interface_state
+
+
+logger = logging.getLogger(__name__)
 
 
 def register_auth_tools(mcp: FastMCP):
@@ -15,6 +20,10 @@ def register_auth_tools(mcp: FastMCP):
         """
         Initialize the CML client with authentication credentials
         
+        Re-initializing replaces the current client. New tool calls use the new
+        client straight away; calls still in flight on the previous client may
+        fail once its connections are closed.
+        
         Args:
             base_url: Base URL of the CML server (e.g., https://cml-server)
             username: Username for CML authentication
@@ -28,15 +37,49 @@ def register_auth_tools(mcp: FastMCP):
         if not base_url.startswith(('http://', 'https://')):
             base_url = f"https://{base_url}"
         
-        print(f"Initializing CML client with base_url: {base_url}", file=sys.stderr)
+        logger.info("Initializing CML client with base_url: %s", base_url)
         cml_auth = CMLAuth(base_url, username, password, verify_ssl)
         
         try:
             token = await cml_auth.authenticate()
-            print(f"Token received: {token[:10]}...", file=sys.stderr)
-            set_client(cml_auth)
-            ssl_status = "enabled" if verify_ssl else "disabled (accepting self-signed certificates)"
-            return f"Successfully authenticated with CML at {base_url} (SSL verification: {ssl_status})"
+            logger.debug("Token received: %s...", token[:10])
         except Exception as e:
-            print(f"Error connecting to CML: {str(e)}", file=sys.stderr)
+            logger.error("Error connecting to CML: %s", e)
+            await cml_auth.aclose()
             return f"Error connecting to CML: {str(e)}"
+        
+        # Install the new client first, then release the previous one's connection pool
+        old_client = get_client()
+        set_client(cml_auth)
+        reset_interface_state()
+        if old_client is not None:
+            try:
+                await old_client.aclose()
+            except Exception as e:
+                logger.warning("Error closing previous CML client: %s", e)
+        
+        ssl_status = "enabled" if verify_ssl else "disabled (accepting self-signed certificates)"
+        return f"Successfully authenticated with CML at {base_url} (SSL verification: {ssl_status})"
+
+    @mcp.tool()
+    async def verify_auth() -> str:
+        """
+        Verify that the current CML authentication token is accepted by the server
+        
+        Returns:
+            A confirmation message or an error description
+        """
+        auth_check = check_auth()
+        if auth_check:
+            return auth_check["error"]
+        
+        cml_client = get_client()
+        try:
+            # Bypass CMLAuth.request so a rejected token is reported, not silently renewed
+            response = await cml_client.client.get("/api/v0/authok")
+            if response.status_code == 401:
+                return f"Authentication token for CML at {cml_client.base_url} is no longer valid; run initialize_client again"
+            response.raise_for_status()
+            return f"Authentication with CML at {cml_client.base_url} is valid"
+        except Exception as e:
+            return f"Error verifying authentication: {str(e)}"
@@ -2,11 +2,14 @@
 Lab lifecycle management tools for CML Lab Builder
 """
 
-import sys
+import logging
 from typing import Dict
 from fastmcp import FastMCP
 from ..client import get_client
-from ..utils import check_auth, handle_api_error
+from ..utils import check_auth, handle_api_error, load_json
+
+
+logger = logging.getLogger(__name__)
 
 
 def register_lab_lifecycle_tools(mcp: FastMCP):
@@ -29,7 +32,7 @@ def register_lab_lifecycle_tools(mcp: FastMCP):
             return auth_check
         
         try:
-            print(f"Creating lab with title: {title}", file=sys.stderr)
+            logger.info("Creating lab with title: %s", title)
             
             response = await get_client().request(
                 "POST", 
@@ -37,8 +40,8 @@ def register_lab_lifecycle_tools(mcp: FastMCP):
                 json={"title": title, "description": description}
             )
             
-            lab_data = response.json()
-            print(f"Lab creation response: {lab_data}", file=sys.stderr)
+            lab_data = load_json(response)
+            logger.debug("Lab creation response: %s", lab_data)
             
             lab_id = lab_data.get("id")
             
@@ -2,11 +2,146 @@
 Topology building tools for CML Lab Builder
 """
 
-import sys
-from typing import Dict, Any, Optional, Union
+import asyncio
+import logging
+import time
+import httpx
+from typing import Dict, Any, List, Optional, Tuple, Union
 from fastmcp import FastMCP
 from ..client import get_client
-from ..utils import check_auth, handle_api_error
+from ..utils import check_auth, handle_api_error, load_json
+
+
+logger = logging.getLogger(__name__)
+
+# Cap concurrent interface lookups to avoid hammering the CML API
+_interface_semaphore = asyncio.Semaphore(8)
+
+# Topology file schema version sent with build_topology imports. 0.2.2 is the
+# format exported by CML 2.5 and later; older releases may reject the import.
+_TOPOLOGY_SCHEMA_VERSION = "0.2.2"
+
+# Whether the server accepts data=true on node interface listings; cleared once
+# the server shows it ignores or rejects the parameter, so later lookups go
+# straight to the fallback. Reset whenever a new client is installed.
+_expanded_listing_supported = True
+
+# Status codes that can mean the data=true query parameter itself was refused
+_PARAMETER_REJECTED_STATUSES = (400, 422)
+
+# Short-lived cache of interface details for the per-interface lookup path,
+# keyed by (lab ID, interface ID)
+_INTERFACE_CACHE_TTL = 2.0
+_INTERFACE_CACHE_MAX = 512
+_interface_cache: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+
+
+def _prune_interface_cache(now: float) -> None:
+    """Drop expired interface cache entries, or everything if still over the size bound"""
+    for key in [k for k, (stamp, _) in _interface_cache.items() if now - stamp >= _INTERFACE_CACHE_TTL]:
+        del _interface_cache[key]
+    if len(_interface_cache) >= _INTERFACE_CACHE_MAX:
+        _interface_cache.clear()
+
+
+async def _get_interface(lab_id: str, interface_id: str) -> Dict[str, Any]:
+    """
+    Get operational details for an interface, reusing recent lookups
+    
+    Args:
+        lab_id: ID of the lab
+        interface_id: ID of the interface
+    
+    Returns:
+        Interface details dictionary
+    """
+    key = (lab_id, interface_id)
+    hit = _interface_cache.get(key)
+    if hit:
+        if time.monotonic() - hit[0] < _INTERFACE_CACHE_TTL:
+            return hit[1]
+        del _interface_cache[key]
+    
+    async with _interface_semaphore:
+        response = await get_client().request(
+            "GET",
+            f"/api/v0/labs/{lab_id}/interfaces/{interface_id}?operational=true"
+        )
+    data = load_json(response)
+    
+    now = time.monotonic()
+    if len(_interface_cache) >= _INTERFACE_CACHE_MAX:
+        _prune_interface_cache(now)
+    _interface_cache[key] = (now, data)
+    return data
+
+
+async def _get_node_interfaces(lab_id: str, node_id: str) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Get the interfaces of a node along with their operational details
+    
+    Args:
+        lab_id: ID of the lab
+        node_id: ID of the node
+    
+    Returns:
+        List of (interface ID, interface details) pairs
+    """
+    global _expanded_listing_supported
+    endpoint = f"/api/v0/labs/{lab_id}/nodes/{node_id}/interfaces?operational=true"
+    interfaces = None
+    
+    if _expanded_listing_supported:
+        try:
+            # Ask for expanded interface objects so a single request is enough
+            response = await get_client().request("GET", f"{endpoint}&data=true")
+            interfaces = load_json(response)
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            if status in _PARAMETER_REJECTED_STATUSES:
+                # data=true was refused only if the plain listing for the same node works
+                interfaces_response = await get_client().request("GET", endpoint)
+                interfaces = load_json(interfaces_response)
+                _expanded_listing_supported = False
+                logger.info("Expanded interface listing rejected (%s), using per-interface lookups", status)
+            elif status < 500:
+                # Bad lab/node IDs (404) or failed re-authentication (403) are real errors
+                raise
+            else:
+                logger.info("Expanded interface listing failed (%s), using per-interface lookups", status)
+        else:
+            # CML may return either a mapping of ID to interface or a list of interfaces
+            if isinstance(interfaces, dict):
+                if all(isinstance(intf, dict) for intf in interfaces.values()):
+                    return list(interfaces.items())
+            elif isinstance(interfaces, list):
+                if all(isinstance(intf, dict) for intf in interfaces):
+                    return [(intf.get("id"), intf) for intf in interfaces]
+            
+            # The server ignored data=true and returned bare IDs, which we can still use
+            _expanded_listing_supported = False
+    
+    # Fall back to listing interface IDs and fetching each one
+    if interfaces is None:
+        interfaces_response = await get_client().request("GET", endpoint)
+        interfaces = load_json(interfaces_response)
+    
+    # Ensure we have an array of interfaces
+    if isinstance(interfaces, str):
+        interfaces = interfaces.split()
+    elif isinstance(interfaces, dict):
+        interfaces = list(interfaces.keys())
+    
+    # Fetch details for all interfaces concurrently
+    details = await asyncio.gather(*(_get_interface(lab_id, iid) for iid in interfaces))
+    return list(zip(interfaces, details))
+
+
+def reset_interface_state() -> None:
+    """Forget per-server interface lookup state, for use when the CML client changes"""
+    global _expanded_listing_supported
+    _expanded_listing_supported = True
+    _interface_cache.clear()
 
 
 def register_topology_tools(mcp: FastMCP):
@@ -70,16 +205,14 @@ def register_topology_tools(mcp: FastMCP):
                 endpoint += "?populate_interfaces=true"
             
             # Make the API request
-            headers = {"Content-Type": "application/json"}
             response = await get_client().request(
                 "POST",
                 endpoint,
-                json=node_data,
-                headers=headers
+                json=node_data
             )
             
             # Process the response
-            result = response.json()
+            result = load_json(response)
             node_id = result.get("id")
             
             if not node_id:
@@ -111,42 +244,24 @@ def register_topology_tools(mcp: FastMCP):
             return auth_check
         
         try:
-            # Get interfaces for the node with operational=true to get details
-            interfaces_response = await get_client().request(
-                "GET", 
-                f"/api/v0/labs/{lab_id}/nodes/{node_id}/interfaces?operational=true"
-            )
-            interfaces = interfaces_response.json()
-            
-            # Ensure we have an array of interfaces
-            if isinstance(interfaces, str):
-                interfaces = interfaces.split()
-            elif isinstance(interfaces, dict):
-                interfaces = list(interfaces.keys())
+            interfaces = await _get_node_interfaces(lab_id, node_id)
             
             # Make sure we have interfaces to work with
             if not interfaces:
                 return {"error": f"No interfaces found for node {node_id}"}
             
             # Find first available physical interface (skip index 0 which is loopback)
-            for interface_id in interfaces:
-                # Get detailed info for this interface
-                interface_detail = await get_client().request(
-                    "GET", 
-                    f"/api/v0/labs/{lab_id}/interfaces/{interface_id}?operational=true"
-                )
-                interface_data = interface_detail.json()
-                
+            for interface_id, interface_data in interfaces:
                 # CRITICAL FIX: Skip loopback interfaces (index 0), start with physical (index 1+)
                 slot = interface_data.get("slot", -1)
                 if slot == 0:
-                    print(f"Skipping loopback interface at slot 0: {interface_id}", file=sys.stderr)
+                    logger.debug("Skipping loopback interface at slot 0: %s", interface_id)
                     continue
                 
                 # Check if physical and not connected
                 if (interface_data.get("type") == "physical" and 
                     interface_data.get("is_connected") == False):
-                    print(f"Found available interface at slot {slot}: {interface_id}", file=sys.stderr)
+                    logger.debug("Found available interface at slot %s: %s", slot, interface_id)
                     return interface_id
             
             return {"error": f"No available physical interface found for node {node_id}"}
@@ -166,7 +281,7 @@ def register_topology_tools(mcp: FastMCP):
             Dictionary with link ID and confirmation message
         """
         try:
-            print(f"Creating link between interfaces {interface_id_a} and {interface_id_b}", file=sys.stderr)
+            logger.info("Creating link between interfaces %s and %s", interface_id_a, interface_id_b)
             
             # Use standard format with src_int and dst_int
             link_data = {
@@ -174,22 +289,24 @@ def register_topology_tools(mcp: FastMCP):
                 "dst_int": interface_id_b
             }
             
-            headers = {"Content-Type": "application/json"}
             response = await get_client().request(
                 "POST", 
                 f"/api/v0/labs/{lab_id}/links",
-                json=link_data,
-                headers=headers
+                json=link_data
             )
             
-            result = response.json()
-            print(f"Link creation response: {result}", file=sys.stderr)
+            result = load_json(response)
+            logger.debug("Link creation response: %s", result)
             
             # Extract the link ID from the response
             link_id = result.get("id")
             if not link_id:
                 return {"error": "Failed to create link, no link ID returned", "response": result}
             
+            # Both interfaces are now connected, so drop any cached details
+            _interface_cache.pop((lab_id, interface_id_a), None)
+            _interface_cache.pop((lab_id, interface_id_b), None)
+            
             return {
                 "link_id": link_id,
                 "message": f"Created link between interfaces {interface_id_a} and {interface_id_b}",
@@ -218,11 +335,13 @@ def register_topology_tools(mcp: FastMCP):
         
         try:
             # Find available interfaces on both nodes
-            interface_a = await _find_available_interface(lab_id, node_id_a)
+            interface_a, interface_b = await asyncio.gather(
+                _find_available_interface(lab_id, node_id_a),
+                _find_available_interface(lab_id, node_id_b)
+            )
             if isinstance(interface_a, dict) and "error" in interface_a:
                 return interface_a
             
-            interface_b = await _find_available_interface(lab_id, node_id_b)
             if isinstance(interface_b, dict) and "error" in interface_b:
                 return interface_b
             
@@ -249,3 +368,98 @@ def register_topology_tools(mcp: FastMCP):
             return auth_check
         
         return await _create_link_helper(lab_id, interface_id_a, interface_id_b)
+
+    @mcp.tool()
+    async def build_topology(
+        title: str,
+        nodes: List[Dict[str, Any]],
+        links: List[Dict[str, str]],
+        description: str = ""
+    ) -> Dict[str, Any]:
+        """
+        Create a new lab with its complete topology in a single import request
+        
+        Args:
+            title: Title of the new lab
+            nodes: Nodes to create, each with 'label' and 'node_definition' and optional 'x' and 'y'
+            links: Links to create, each with 'node_a' and 'node_b' set to node labels
+            description: Optional description for the lab
+        
+        Returns:
+            Dictionary with lab ID and confirmation message
+        """
+        auth_check = check_auth()
+        if auth_check:
+            return auth_check
+        
+        try:
+            # Assign topology-local IDs to nodes, keyed by label for link resolution
+            topology_nodes = {}
+            for index, node in enumerate(nodes):
+                label = node.get("label")
+                if not label or not node.get("node_definition"):
+                    return {"error": f"Node at position {index} needs both 'label' and 'node_definition'"}
+                if label in topology_nodes:
+                    return {"error": f"Duplicate node label: {label}"}
+                
+                topology_nodes[label] = {
+                    "id": f"n{index}",
+                    "label": label,
+                    "node_definition": node["node_definition"],
+                    "x": node.get("x", 0),
+                    "y": node.get("y", 0),
+                    "interfaces": []
+                }
+            
+            def _next_interface(node: Dict[str, Any]) -> str:
+                # Declare slot 0 but never link it, mirroring link_nodes which skips
+                # slot 0; links use slot 1 onwards
+                if not node["interfaces"]:
+                    node["interfaces"].append({"id": f"{node['id']}i0", "slot": 0, "type": "physical"})
+                slot = len(node["interfaces"])
+                interface_id = f"{node['id']}i{slot}"
+                node["interfaces"].append({"id": interface_id, "slot": slot, "type": "physical"})
+                return interface_id
+            
+            topology_links = []
+            for index, link in enumerate(links):
+                node_a = topology_nodes.get(link.get("node_a"))
+                node_b = topology_nodes.get(link.get("node_b"))
+                if node_a is None or node_b is None:
+                    return {"error": f"Link at position {index} references an unknown node label"}
+                
+                topology_links.append({
+                    "id": f"l{index}",
+                    "n1": node_a["id"],
+                    "i1": _next_interface(node_a),
+                    "n2": node_b["id"],
+                    "i2": _next_interface(node_b)
+                })
+            
+            topology = {
+                "lab": {"title": title, "description": description, "version": _TOPOLOGY_SCHEMA_VERSION},
+                "nodes": list(topology_nodes.values()),
+                "links": topology_links
+            }
+            
+            response = await get_client().request(
+                "POST",
+                "/api/v0/import",
+                params={"title": title},
+                json=topology
+            )
+            
+            result = load_json(response)
+            lab_id = result.get("id")
+            
+            if not lab_id:
+                return {"error": "Failed to import topology, no lab ID returned", "response": result}
+            
+            return {
+                "lab_id": lab_id,
+                "message": f"Built lab '{title}' with {len(topology_nodes)} nodes and {len(topology_links)} links, ID: {lab_id}",
+                "status": "success",
+                "warnings": result.get("warnings", [])
+            }
+        except Exception as e:
+            return handle_api_error("build_topology", e)
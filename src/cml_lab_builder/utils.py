@@ -2,12 +2,16 @@
 Utility functions for the CML Lab Builder
 """
 
-import sys
-import traceback
+import logging
+import httpx
+import orjson
 from typing import Dict, Any, Union
 from .client import get_client
 
 
+logger = logging.getLogger(__name__)
+
+
 def check_auth() -> Union[None, Dict[str, str]]:
     """
     Check if the client is authenticated
@@ -20,6 +24,19 @@ def check_auth() -> Union[None, Dict[str, str]]:
     return None
 
 
+def load_json(response: httpx.Response) -> Any:
+    """
+    Decode a JSON response body with orjson
+    
+    Args:
+        response: HTTP response from the CML API
+    
+    Returns:
+        Decoded JSON payload
+    """
+    return orjson.loads(response.content)
+
+
 def handle_api_error(operation: str, error: Exception) -> Dict[str, Any]:
     """
     Handle API errors consistently
@@ -31,6 +48,5 @@ def handle_api_error(operation: str, error: Exception) -> Dict[str, Any]:
     Returns:
         Error dictionary with consistent format
     """
-    print(f"Error during {operation}: {str(error)}", file=sys.stderr)
-    traceback.print_exc(file=sys.stderr)
-    return {"error": f"Error during {operation}: {str(e)}"}
+    logger.exception("Error during %s: %s", operation, error)
+    return {"error": f"Error during {operation}: {str(error)}"}